@@ -98,10 +98,13 @@ class ExpirationTracker:
         """Return all tracked items"""
         return self.expiration_data["items"]
     
-    def get_expiring_soon(self, days=7):
-        """Return items expiring within specified days"""
+    def iter_expiring_soon(self, days=7):
+        """Yield items expiring within specified days, in storage order.
+        
+        Consumers that only need a count or a short preview can iterate
+        this without materializing (and sorting) the full list.
+        """
         today = datetime.date.today()
-        expiring_soon = []
         
         for item in self.expiration_data["items"]:
             try:
@@ -111,16 +114,17 @@ class ExpirationTracker:
                 if 0 <= days_left <= days:
                     item_with_days = item.copy()
                     item_with_days["days_left"] = days_left
-                    expiring_soon.append(item_with_days)
+                    yield item_with_days
             except Exception as e:
                 print(f"Error processing expiry date for {item['name']}: {e}")
-                
-        return sorted(expiring_soon, key=lambda x: x["days_left"])
     
-    def get_expired(self):
-        """Return items that have already expired"""
+    def get_expiring_soon(self, days=7):
+        """Return items expiring within specified days"""
+        return sorted(self.iter_expiring_soon(days), key=lambda x: x["days_left"])
+    
+    def iter_expired(self):
+        """Yield items that have already expired, in storage order"""
         today = datetime.date.today()
-        expired = []
         
         for item in self.expiration_data["items"]:
             try:
@@ -130,11 +134,13 @@ class ExpirationTracker:
                 if days_expired > 0:
                     item_with_days = item.copy()
                     item_with_days["days_expired"] = days_expired
-                    expired.append(item_with_days)
+                    yield item_with_days
             except Exception as e:
                 print(f"Error processing expiry date for {item['name']}: {e}")
-                
-        return sorted(expired, key=lambda x: x["days_expired"], reverse=True)
+    
+    def get_expired(self):
+        """Return items that have already expired"""
+        return sorted(self.iter_expired(), key=lambda x: x["days_expired"], reverse=True)
 
 # Helper function to display the expiration tracker UI
 def display_expiration_tracker():
@@ -1,12 +1,28 @@
 import streamlit as st
+import bisect
+import heapq
 import json
+import re
+import pandas as pd
 from recipe_generator import RecipeGenerator
 from utils import load_css, display_food_image_carousel
 from database import init_db
-from expiration_tracker import display_expiration_tracker
+from expiration_tracker import ExpirationTracker, display_expiration_tracker
 from user_preferences import display_user_preferences, UserPreferences, get_personalized_recommendations
 import datetime
 
+# Optional: pyahocorasick and pygtrie accelerate the ingredient expiration
+# matching; without them the matcher falls back to a plain substring scan
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import pygtrie
+except ImportError:
+    pygtrie = None
+
 # Initialize database
 init_db()
 
@@ -28,9 +44,218 @@ if 'recipe' not in st.session_state:
 if 'like_recipe' not in st.session_state:
     st.session_state.like_recipe = False
 
+# Typical expiration times for common ingredients. Defined once at import so
+# Streamlit reruns reuse the same object instead of rebuilding it.
+_COMMON_EXPIRATIONS = {
+    "onion": {"shelf": "2-3 months", "fridge": "1-2 months", "freezer": "8-12 months"},
+    "rice": {"shelf": "1-2 years (white), 3-6 months (brown)", "fridge": "Not recommended", "freezer": "Up to 6 months cooked"},
+    "chicken": {"shelf": "Not recommended raw", "fridge": "1-2 days raw, 3-4 days cooked", "freezer": "9-12 months raw, 2-6 months cooked"},
+    "paneer": {"shelf": "Not recommended", "fridge": "1-2 weeks unopened, 3-5 days opened", "freezer": "3-4 months"},
+    "green chilli": {"shelf": "1-2 weeks", "fridge": "2-3 weeks", "freezer": "4-6 months"},
+    "eggs": {"shelf": "Not recommended", "fridge": "3-5 weeks", "freezer": "Not recommended raw"},
+    "milk": {"shelf": "Not recommended fresh", "fridge": "5-7 days opened", "freezer": "3 months"},
+    "tomato": {"shelf": "4-7 days ripe", "fridge": "1-2 weeks", "freezer": "2-3 months"},
+    "potato": {"shelf": "2-3 months cool, dark place", "fridge": "3-4 weeks", "freezer": "10-12 months cooked"},
+    "bread": {"shelf": "5-7 days", "fridge": "1-2 weeks", "freezer": "2-3 months"},
+    "cheese": {"shelf": "Not recommended soft cheese", "fridge": "1-4 weeks (hard), 1-2 weeks (soft)", "freezer": "6-8 months"},
+    "leafy greens": {"shelf": "Not recommended", "fridge": "3-5 days", "freezer": "8-12 months blanched"},
+    "fruits": {"shelf": "2-7 days ripe", "fridge": "1-2 weeks", "freezer": "8-12 months"},
+    "meat": {"shelf": "Not recommended raw", "fridge": "1-2 days raw, 3-4 days cooked", "freezer": "4-12 months depending on type"},
+    "vegetables": {"shelf": "Varies by type", "fridge": "1-2 weeks most varieties", "freezer": "8-12 months"},
+    "beans": {"shelf": "1-2 years dry", "fridge": "3-5 days cooked", "freezer": "1-2 months cooked"},
+    "tofu": {"shelf": "Not recommended", "fridge": "3-5 days opened", "freezer": "4-6 months"},
+    "oil": {"shelf": "3-5 months opened", "fridge": "Up to 1 year", "freezer": "Not recommended"},
+    "garlic": {"shelf": "3-6 months whole head", "fridge": "1-2 weeks peeled", "freezer": "6-8 months"},
+    "herbs": {"shelf": "Not recommended fresh", "fridge": "1-2 weeks fresh", "freezer": "6-12 months"},
+    "spices": {"shelf": "1-2 years ground, 2-3 years whole", "fridge": "Not necessary", "freezer": "Not necessary"}
+}
+
+# Frozen key set for O(1) whole-word hits before any scanning kicks in
+_EXP_KEYS_SET = frozenset(_COMMON_EXPIRATIONS)
+
+# Precomputed (name, data) pairs so the fallback scan iterates a flat
+# tuple and skips the second dict lookup on a hit
+_EXP_ITEMS = tuple(_COMMON_EXPIRATIONS.items())
+
+# Sorted keys with parallel values for the bisect probe in
+# _match_expiration; a contiguous sorted list stays cache-friendly if the
+# dictionary grows toward a full USDA-sized ingredient list
+_EXP_KEYS_SORTED = sorted(_COMMON_EXPIRATIONS)
+_EXP_VALUES = [_COMMON_EXPIRATIONS[k] for k in _EXP_KEYS_SORTED]
+
+# One compiled alternation over every key: a single C-level search replaces
+# a Python `in` check per key. Longest keys first so "leafy greens" wins
+# over a shorter name contained in it.
+_EXP_PATTERN = re.compile(
+    r"\b(" + "|".join(map(re.escape, sorted(_COMMON_EXPIRATIONS, key=len, reverse=True))) + r")\b"
+)
+
+# Pre-built HTML templates for the expiration guide cards. Formatting a
+# constant is cheaper on reruns than rebuilding the f-string literals.
+_EXPIRING_ITEM_TMPL = """
+<div style="background-color: #fff3e0; padding: 8px; border-radius: 5px; 
+            margin-bottom: 8px; border-left: 3px solid #ff9800;">
+    <span style="font-weight: bold;">{name}</span> ({quantity})
+    <br><span style="font-size: 12px;">Expires {days_text}</span>
+</div>
+"""
+
+_EXPIRATION_CARD_TMPL = """
+<div style="background-color: #fff3e0; border-radius: 8px; padding: 12px; 
+           margin-bottom: 12px; border-left: 3px solid #FF9800; box-shadow: 0 1px 2px rgba(0,0,0,0.05);">
+    <div style="font-weight: 600; color: #E65100; margin-bottom: 8px; font-size: 15px;">
+        {ing}
+    </div>
+    <div style="display: flex; gap: 10px; flex-wrap: wrap;">
+        <div style="flex: 1; min-width: 110px;">
+            <div style="font-size: 12px; color: #888; margin-bottom: 2px;">SHELF</div>
+            <div style="font-size: 14px;">{shelf}</div>
+        </div>
+        <div style="flex: 1; min-width: 110px;">
+            <div style="font-size: 12px; color: #888; margin-bottom: 2px;">REFRIGERATOR</div>
+            <div style="font-size: 14px;">{fridge}</div>
+        </div>
+        <div style="flex: 1; min-width: 110px;">
+            <div style="font-size: 12px; color: #888; margin-bottom: 2px;">FREEZER</div>
+            <div style="font-size: 14px;">{freezer}</div>
+        </div>
+    </div>
+</div>
+"""
+
+# The unmatched card is identical except for the ingredient name, so it is
+# kept as two halves and joined around the name: one concatenation instead
+# of formatting ~400 bytes of static HTML per unmatched ingredient
+_UNMATCHED_PREFIX = """
+<div style="background-color: #e8f5e9; border-radius: 8px; padding: 12px; 
+          margin-bottom: 12px; border-left: 3px solid #4CAF50; box-shadow: 0 1px 2px rgba(0,0,0,0.05);">
+    <div style="font-weight: 600; color: #2E7D32; margin-bottom: 8px; font-size: 15px;">
+        """
+_UNMATCHED_SUFFIX = """
+    </div>
+    <div style="font-size: 14px; display: flex; align-items: center;">
+        <span style="margin-right: 10px;">🔍</span>
+        <span>Track this ingredient's expiration date for personalized reminders.</span>
+        <a href="/?page=expiration" style="margin-left: 8px; color: #1976D2; text-decoration: none; font-weight: 500;">
+            Add to tracker
+        </a>
+    </div>
+</div>
+"""
+
 def set_page(page_name):
     st.session_state.page = page_name
 
+@st.cache_resource(show_spinner=False)
+def _build_expiration_automaton():
+    """Build an Aho-Corasick automaton over the common ingredient names.
+
+    Built once per session (Streamlit caches the resource), so each rerun
+    scans a user ingredient in a single pass instead of substring-checking
+    it against every known ingredient.
+    """
+    automaton = ahocorasick.Automaton()
+    for name, exp_data in _COMMON_EXPIRATIONS.items():
+        automaton.add_word(name, (name, exp_data))
+    automaton.make_automaton()
+    return automaton
+
+@st.cache_resource(show_spinner=False)
+def _build_expiration_tries():
+    """Build prefix tries over the common ingredient names.
+
+    key_trie holds the full names and answers "does this ingredient (or one
+    of its words) start with a known name". fragment_trie holds every suffix
+    of every name and answers "is the typed ingredient a fragment of a known
+    name", e.g. "greens" inside "leafy greens". Both scale to a much larger
+    ingredient list without the per-key substring scan.
+    """
+    key_trie = pygtrie.CharTrie()
+    fragment_trie = pygtrie.CharTrie()
+    for name, exp_data in _COMMON_EXPIRATIONS.items():
+        key_trie[name] = exp_data
+        for start in range(len(name)):
+            fragment_trie.setdefault(name[start:], exp_data)
+    return key_trie, fragment_trie
+
+def _match_expiration(ing):
+    """Find expiration info for a user ingredient.
+
+    Matches in both directions like the original loop: a known name can
+    appear inside the typed ingredient ("red onion" -> "onion") or the
+    typed ingredient inside a known name ("greens" -> "leafy greens").
+    Returns the expiration dict or None.
+    """
+    # Cheapest check first: an exact whole-word hit via one set
+    # intersection per ingredient. Bigrams keep multi-word names like
+    # "leafy greens" matching.
+    toks = ing.split()
+    candidates = set(toks)
+    candidates.update(" ".join(pair) for pair in zip(toks, toks[1:]))
+    candidates.add(ing)
+    hit = candidates & _EXP_KEYS_SET
+    if hit:
+        return _COMMON_EXPIRATIONS[next(iter(hit))]
+
+    # Whole-word match anywhere in the ingredient via the compiled
+    # alternation: one regex search instead of a check per key
+    m = _EXP_PATTERN.search(ing)
+    if m:
+        return _COMMON_EXPIRATIONS[m.group(1)]
+
+    # Known name anywhere inside the typed ingredient: single-pass scan
+    if ahocorasick is not None:
+        for _, (name, exp_data) in _build_expiration_automaton().iter(ing):
+            return exp_data
+
+    # Known name at the start of the ingredient or one of its words, or
+    # the typed ingredient is a fragment of a known name
+    if pygtrie is not None:
+        key_trie, fragment_trie = _build_expiration_tries()
+        for tok in (ing, *ing.split()):
+            step = key_trie.longest_prefix(tok)
+            if step:
+                return step.value
+        if fragment_trie.has_node(ing):
+            return next(fragment_trie.itervalues(prefix=ing))
+
+    # Lexicographic probe: a key that starts the ingredient sorts right at
+    # or before the ingredient's insertion point, so two comparisons cover
+    # the common "known name plus qualifier" case ("onion, red")
+    i = bisect.bisect_left(_EXP_KEYS_SORTED, ing)
+    for j in (i - 1, i):
+        if 0 <= j < len(_EXP_KEYS_SORTED) and _EXP_KEYS_SORTED[j] in ing:
+            return _EXP_VALUES[j]
+
+    # Plain scan: the reference semantics, and the only path when the
+    # optional libraries are missing
+    for common_ing, exp_data in _EXP_ITEMS:
+        if common_ing in ing or ing in common_ing:
+            return exp_data
+    return None
+
+@st.cache_data(show_spinner=False)
+def _render_expiration_html(ings):
+    """Build the expiration guide cards for a tuple of ingredients.
+
+    Cached on the (sorted, deduplicated) ingredient tuple, so reruns with
+    unchanged input return the finished HTML in O(1) and skip the matching
+    and formatting entirely.
+    """
+    # Build all cards first and emit them in one markdown call, instead of
+    # paying a Streamlit round trip per ingredient
+    parts = []
+    for ing in ings:
+        # Find the closest match in our common expirations dictionary
+        exp_data = _match_expiration(ing)
+
+        if exp_data:
+            parts.append(_EXPIRATION_CARD_TMPL.format(ing=ing.capitalize(), **exp_data))
+        # If no match found, show generic advice
+        else:
+            parts.append(_UNMATCHED_PREFIX + ing.capitalize() + _UNMATCHED_SUFFIX)
+    return "".join(parts)
+
 def main():
     # Initialize recipe generator
     recipe_gen = RecipeGenerator()
@@ -86,7 +311,6 @@ def display_home_page(recipe_gen, user_prefs):
         
         # Option to auto-fill from expiring soon ingredients
         if st.checkbox("Include expiring soon ingredients"):
-            from expiration_tracker import ExpirationTracker
             tracker = ExpirationTracker()
             expiring_items = tracker.get_expiring_soon(days=3)
             
@@ -140,102 +364,131 @@ def display_home_page(recipe_gen, user_prefs):
     # Main content area
     col1, col2 = st.columns([2, 1])
 
+    # One combined OpenAI request returns the recipe, the waste tips and
+    # the substitutions together: a single round trip, and the ingredient
+    # list is only sent once
+    recipe = waste_tips = substitutions = None
+
+    # Parse the textarea once into a normalized, hashable tuple; every
+    # consumer (API calls, personalization, expiration guide) reuses it
+    ingredients_list = tuple(i.strip().lower() for i in ingredients.split("\n") if i.strip())
+
+    if ingredients_list:
+        # Get personalized recommendations if requested
+        if use_preferences:
+            personalization = get_personalized_recommendations(list(ingredients_list))
+        else:
+            personalization = None
+
+        if generate_btn:
+            # Stream the response so the user sees progress (and the recipe
+            # title) at the first tokens instead of after the full payload
+            progress = st.empty()
+            progress.info("🍳 Cooking up your recipe...")
+            pieces = []
+            title_shown = False
+            for piece in recipe_gen.stream_generate_all(ingredients_list, dietary_prefs, personalization):
+                pieces.append(piece)
+                if not title_shown:
+                    title_match = re.search(r'"title"\s*:\s*"([^"]+)"', "".join(pieces))
+                    if title_match:
+                        progress.info(f"🍳 Cooking up **{title_match.group(1)}**...")
+                        title_shown = True
+            progress.empty()
+            result = recipe_gen.parse_combined("".join(pieces))
+        else:
+            with st.spinner("Generating tips..."):
+                result = recipe_gen.generate_all(ingredients_list, dietary_prefs, personalization)
+        waste_tips = result["waste_tips"]
+        substitutions = result["substitutions"]
+        if generate_btn:
+            recipe = result["recipe"]
+
     with col1:
-        if generate_btn and ingredients:
-            with st.spinner("Generating your recipe..."):
-                ingredients_list = [i.strip() for i in ingredients.split("\n") if i.strip()]
-                
-                # Get personalized recommendations if requested
-                if use_preferences:
-                    personalization = get_personalized_recommendations(ingredients_list)
+        if generate_btn and recipe:
+            st.session_state.recipe = recipe
+            
+            # Display recipe card
+            with st.container():
+                # Check if we have a valid recipe or an error message
+                if recipe.get('prep_time', 0) == 0 and recipe.get('servings', 0) == 0:
+                    # This is likely an error response
+                    st.error(f"⚠️ {recipe['title']}")
+                    
+                    # Show instructions as error message
+                    for message in recipe['instructions']:
+                        st.warning(message)
+                    
+                    # Show tips as info message
+                    st.info(recipe['tips'])
                 else:
-                    personalization = None
-                
-                recipe = recipe_gen.generate_recipe(ingredients_list, dietary_prefs, personalization)
-                st.session_state.recipe = recipe
-                
-                # Display recipe card
-                with st.container():
-                    # Check if we have a valid recipe or an error message
-                    if recipe.get('prep_time', 0) == 0 and recipe.get('servings', 0) == 0:
-                        # This is likely an error response
-                        st.error(f"⚠️ {recipe['title']}")
-                        
-                        # Show instructions as error message
-                        for message in recipe['instructions']:
-                            st.warning(message)
-                        
-                        # Show tips as info message
-                        st.info(recipe['tips'])
-                    else:
-                        # Show the successful recipe
-                        st.subheader(f"📖 {recipe['title']}")
-                        
-                        # Recipe feedback buttons in a row
-                        like_col, dislike_col, save_col = st.columns([1, 1, 2])
-                        with like_col:
-                            if st.button("👍 Like", use_container_width=True):
-                                user_prefs.add_liked_recipe(recipe)
-                                user_prefs.add_meal_to_history(recipe['title'])
-                                st.success("Recipe saved to favorites!")
-                        
-                        with dislike_col:
-                            if st.button("👎 Dislike", use_container_width=True):
-                                user_prefs.add_disliked_recipe(recipe)
-                                st.info("We'll avoid similar recipes in the future")
-                                
-                        with save_col:
-                            meal_types = ["Breakfast", "Lunch", "Dinner", "Snack", "Dessert"]
-                            selected_meal = st.selectbox("Save as meal type:", meal_types, index=2)
+                    # Show the successful recipe
+                    st.subheader(f"📖 {recipe['title']}")
+                    
+                    # Recipe feedback buttons in a row
+                    like_col, dislike_col, save_col = st.columns([1, 1, 2])
+                    with like_col:
+                        if st.button("👍 Like", use_container_width=True):
+                            user_prefs.add_liked_recipe(recipe)
+                            user_prefs.add_meal_to_history(recipe['title'])
+                            st.success("Recipe saved to favorites!")
+                    
+                    with dislike_col:
+                        if st.button("👎 Dislike", use_container_width=True):
+                            user_prefs.add_disliked_recipe(recipe)
+                            st.info("We'll avoid similar recipes in the future")
                             
-                        st.write(f"⏱️ Prep Time: {recipe['prep_time']} minutes")
-                        st.write(f"👥 Servings: {recipe['servings']}")
+                    with save_col:
+                        meal_types = ["Breakfast", "Lunch", "Dinner", "Snack", "Dessert"]
+                        selected_meal = st.selectbox("Save as meal type:", meal_types, index=2)
                         
-                        # Show cuisine if available
-                        if 'cuisine' in recipe:
-                            st.write(f"🌍 Cuisine: {recipe['cuisine']}")
+                    st.write(f"⏱️ Prep Time: {recipe['prep_time']} minutes")
+                    st.write(f"👥 Servings: {recipe['servings']}")
+                    
+                    # Show cuisine if available
+                    if 'cuisine' in recipe:
+                        st.write(f"🌍 Cuisine: {recipe['cuisine']}")
+
+                    st.write("### Ingredients")
+                    for ingredient in recipe['ingredients']:
+                        st.write(f"• {ingredient}")
 
-                        st.write("### Ingredients")
-                        for ingredient in recipe['ingredients']:
-                            st.write(f"• {ingredient}")
+                    st.write("### Instructions")
+                    for idx, step in enumerate(recipe['instructions'], 1):
+                        st.write(f"{idx}. {step}")
 
-                        st.write("### Instructions")
-                        for idx, step in enumerate(recipe['instructions'], 1):
-                            st.write(f"{idx}. {step}")
+                    st.write("### Tips")
+                    st.info(recipe['tips'])
+                    
+                    # Add feature to save ingredients to expiration tracker
+                    st.write("### Track Leftover Ingredients")
+                    with st.expander("Add unused ingredients to expiration tracker"):
+                        tracker = ExpirationTracker()
 
-                        st.write("### Tips")
-                        st.info(recipe['tips'])
+                        ingredient_to_track = st.selectbox(
+                            "Select ingredient to track:", 
+                            [ing.split(',')[0].strip() for ing in recipe['ingredients']]
+                        )
                         
-                        # Add feature to save ingredients to expiration tracker
-                        st.write("### Track Leftover Ingredients")
-                        with st.expander("Add unused ingredients to expiration tracker"):
-                            from expiration_tracker import ExpirationTracker
-                            tracker = ExpirationTracker()
-                            
-                            ingredient_to_track = st.selectbox(
-                                "Select ingredient to track:", 
-                                [ing.split(',')[0].strip() for ing in recipe['ingredients']]
-                            )
-                            
-                            expiry_date = st.date_input(
-                                "Expiration date:",
-                                value=(datetime.date.today() + datetime.timedelta(days=7)),
-                                min_value=datetime.date.today()
+                        expiry_date = st.date_input(
+                            "Expiration date:",
+                            value=(datetime.date.today() + datetime.timedelta(days=7)),
+                            min_value=datetime.date.today()
+                        )
+                        
+                        quantity = st.text_input("Quantity (optional):")
+                        
+                        if st.button("Add to Tracker"):
+                            success = tracker.add_item(
+                                ingredient_to_track, 
+                                expiry_date, 
+                                quantity
                             )
                             
-                            quantity = st.text_input("Quantity (optional):")
-                            
-                            if st.button("Add to Tracker"):
-                                success = tracker.add_item(
-                                    ingredient_to_track, 
-                                    expiry_date, 
-                                    quantity
-                                )
-                                
-                                if success:
-                                    st.success(f"Added {ingredient_to_track} to expiration tracker!")
-                                else:
-                                    st.error("Error adding item. Please try again.")
+                            if success:
+                                st.success(f"Added {ingredient_to_track} to expiration tracker!")
+                            else:
+                                st.error("Error adding item. Please try again.")
 
     with col2:
         st.markdown("""
@@ -245,67 +498,64 @@ def display_home_page(recipe_gen, user_prefs):
         </div>
         """, unsafe_allow_html=True)
         
-        if ingredients:
-            with st.spinner("Generating tips..."):
-                waste_tips = recipe_gen.get_waste_reduction_tips(ingredients.split("\n"))
-                
-                # Check if we have tips or error messages
-                if isinstance(waste_tips, list) and len(waste_tips) == 1 and isinstance(waste_tips[0], str) and any(error_keyword in waste_tips[0].lower() 
-                                               for error_keyword in ["unavailable", "api key", "billing"]):
-                    st.warning(waste_tips[0])
-                else:
-                    # Create a formatted container for tips with better styling
-                    with st.container():
-                        # Check if the tips are in the new format (list of dicts with ingredient and tips)
-                        if isinstance(waste_tips, list) and len(waste_tips) > 0 and isinstance(waste_tips[0], dict) and "ingredient" in waste_tips[0]:
-                            # Iterate through the ingredients and their tips
-                            for item in waste_tips:
-                                ingredient = item.get("ingredient", "")
-                                tips = item.get("tips", [])
-                                
-                                if ingredient and tips:
-                                    # Create a compact card for each ingredient with its tips
-                                    st.markdown(
-                                        f"""
-                                        <div style="background-color: #f5f9f5; border-radius: 8px; padding: 12px; 
-                                                   margin-bottom: 12px; border-left: 3px solid #4CAF50; box-shadow: 0 1px 2px rgba(0,0,0,0.05);">
-                                            <div style="font-weight: 600; color: #2E7D32; margin-bottom: 8px; font-size: 15px;">
-                                                {ingredient}
-                                            </div>
-                                            <div style="margin-left: 5px;">
-                                                {"".join([f'<div style="display: flex; margin-bottom: 6px; align-items: flex-start;">'
-                                                        f'<div style="color: #4CAF50; margin-right: 6px; font-size: 14px;">•</div>'
-                                                        f'<div style="font-size: 14px; line-height: 1.4; color: #333;">{tip}</div>'
-                                                        f'</div>' for tip in tips])}
-                                            </div>
+        if waste_tips is not None:
+            # Check if we have tips or error messages
+            if isinstance(waste_tips, list) and len(waste_tips) == 1 and isinstance(waste_tips[0], str) and any(error_keyword in waste_tips[0].lower() 
+                                           for error_keyword in ["unavailable", "api key", "billing"]):
+                st.warning(waste_tips[0])
+            else:
+                # Create a formatted container for tips with better styling
+                with st.container():
+                    # Check if the tips are in the new format (list of dicts with ingredient and tips)
+                    if isinstance(waste_tips, list) and len(waste_tips) > 0 and isinstance(waste_tips[0], dict) and "ingredient" in waste_tips[0]:
+                        # Iterate through the ingredients and their tips
+                        for item in waste_tips:
+                            ingredient = item.get("ingredient", "")
+                            tips = item.get("tips", [])
+                            
+                            if ingredient and tips:
+                                # Create a compact card for each ingredient with its tips
+                                st.markdown(
+                                    f"""
+                                    <div style="background-color: #f5f9f5; border-radius: 8px; padding: 12px; 
+                                               margin-bottom: 12px; border-left: 3px solid #4CAF50; box-shadow: 0 1px 2px rgba(0,0,0,0.05);">
+                                        <div style="font-weight: 600; color: #2E7D32; margin-bottom: 8px; font-size: 15px;">
+                                            {ingredient}
                                         </div>
-                                        """, 
-                                        unsafe_allow_html=True
-                                    )
-                        else:
-                            # Fallback to the original format for backward compatibility
-                            for tip in waste_tips:
-                                # Check if tip is a string or other type
-                                if isinstance(tip, str):
-                                    # Clean up the tip text if it's a string
-                                    tip_text = tip.strip()
-                                    if not tip_text:  # Skip empty tips
-                                        continue
-                                else:
-                                    # Handle case where tip might be a dictionary or other type
-                                    tip_text = str(tip)
-                                    
-                                # Create a card-like appearance for each tip
-                                with st.container():
-                                    st.markdown(
-                                        f"""
-                                        <div style="background-color: #f5f9f5; border-radius: 8px; padding: 10px; 
-                                                  margin-bottom: 8px; border-left: 3px solid #4CAF50;">
-                                            <span style='font-size: 14px; color: #333;'>• {tip_text}</span>
+                                        <div style="margin-left: 5px;">
+                                            {"".join([f'<div style="display: flex; margin-bottom: 6px; align-items: flex-start;">'
+                                                    f'<div style="color: #4CAF50; margin-right: 6px; font-size: 14px;">•</div>'
+                                                    f'<div style="font-size: 14px; line-height: 1.4; color: #333;">{tip}</div>'
+                                                    f'</div>' for tip in tips])}
                                         </div>
-                                        """, 
-                                        unsafe_allow_html=True
-                                    )
+                                    </div>
+                                    """, 
+                                    unsafe_allow_html=True
+                                )
+                    else:
+                        # Fallback to the original format for backward compatibility
+                        for tip in waste_tips:
+                            # Check if tip is a string or other type
+                            if isinstance(tip, str):
+                                # Clean up the tip text if it's a string
+                                tip_text = tip.strip()
+                                if not tip_text:  # Skip empty tips
+                                    continue
+                            else:
+                                # Handle case where tip might be a dictionary or other type
+                                tip_text = str(tip)
+                                
+                            # Create a card-like appearance for each tip
+                            with st.container():
+                                st.markdown(
+                                    f"""
+                                    <div style="background-color: #f5f9f5; border-radius: 8px; padding: 10px; 
+                                              margin-bottom: 8px; border-left: 3px solid #4CAF50;">
+                                        <span style='font-size: 14px; color: #333;'>• {tip_text}</span>
+                                    </div>
+                                    """, 
+                                    unsafe_allow_html=True
+                                )
 
         st.markdown("""
         <div style="display: flex; align-items: center; margin-bottom: 10px; margin-top: 20px; border-bottom: 1px solid #f0f2f6; padding-bottom: 6px;">
@@ -314,39 +564,36 @@ def display_home_page(recipe_gen, user_prefs):
         </div>
         """, unsafe_allow_html=True)
         
-        if ingredients:
-            with st.spinner("Finding substitutions..."):
-                substitutions = recipe_gen.get_substitutions(ingredients.split("\n"))
-                
-                # Check for any error messages in the first substitution
-                first_ingredient = next(iter(substitutions.items()))[0]
-                first_subs = substitutions[first_ingredient]
-                
-                if len(first_subs) == 1 and any(error_keyword in first_subs[0].lower() 
-                                               for error_keyword in ["unavailable", "api key", "billing"]):
-                    # Display a single warning instead of repeating for each ingredient
-                    st.warning(first_subs[0])
-                else:
-                    # Create better-looking containers for substitutions
-                    for original, subs in substitutions.items():
-                        st.markdown(
-                            f"""
-                            <div style="background-color: #e3f2fd; border-radius: 8px; padding: 12px; 
-                                      margin-bottom: 12px; border-left: 3px solid #2196F3; box-shadow: 0 1px 2px rgba(0,0,0,0.05);">
-                                <div style="font-weight: 600; color: #1976D2; margin-bottom: 8px; font-size: 15px;">
-                                    {original.capitalize()} can be replaced with:
-                                </div>
-                                <div style="margin-left: 5px;">
-                                    {"".join([f'<div style="display: flex; margin-bottom: 6px; align-items: flex-start;">'
-                                            f'<div style="color: #2196F3; margin-right: 6px; font-size: 14px;">•</div>'
-                                            f'<div style="font-size: 14px; line-height: 1.4; color: #333;">{sub if isinstance(sub, str) else str(sub)}</div>'
-                                            f'</div>' for sub in subs])}
-                                </div>
+        if substitutions is not None:
+            # Check for any error messages in the first substitution
+            first_ingredient = next(iter(substitutions.items()))[0]
+            first_subs = substitutions[first_ingredient]
+            
+            if len(first_subs) == 1 and any(error_keyword in first_subs[0].lower() 
+                                           for error_keyword in ["unavailable", "api key", "billing"]):
+                # Display a single warning instead of repeating for each ingredient
+                st.warning(first_subs[0])
+            else:
+                # Create better-looking containers for substitutions
+                for original, subs in substitutions.items():
+                    st.markdown(
+                        f"""
+                        <div style="background-color: #e3f2fd; border-radius: 8px; padding: 12px; 
+                                  margin-bottom: 12px; border-left: 3px solid #2196F3; box-shadow: 0 1px 2px rgba(0,0,0,0.05);">
+                            <div style="font-weight: 600; color: #1976D2; margin-bottom: 8px; font-size: 15px;">
+                                {original.capitalize()} can be replaced with:
                             </div>
-                            """, 
-                            unsafe_allow_html=True
-                        )
-        
+                            <div style="margin-left: 5px;">
+                                {"".join([f'<div style="display: flex; margin-bottom: 6px; align-items: flex-start;">'
+                                        f'<div style="color: #2196F3; margin-right: 6px; font-size: 14px;">•</div>'
+                                        f'<div style="font-size: 14px; line-height: 1.4; color: #333;">{sub if isinstance(sub, str) else str(sub)}</div>'
+                                        f'</div>' for sub in subs])}
+                            </div>
+                        </div>
+                        """, 
+                        unsafe_allow_html=True
+                    )
+    
         # Expiration reminder
         st.markdown("""
         <div style="display: flex; align-items: center; margin-bottom: 10px; margin-top: 20px; border-bottom: 1px solid #f0f2f6; padding-bottom: 6px;">
@@ -357,65 +604,49 @@ def display_home_page(recipe_gen, user_prefs):
         
         # Show expiring ingredients and guide for input ingredients
         try:
-            from expiration_tracker import ExpirationTracker
             tracker = ExpirationTracker()
             
-            # Get items from expiration tracker
-            expiring_items = tracker.get_expiring_soon(days=3)
-            expired_items = tracker.get_expired()
-            
-            # Typical expiration times for common ingredients
-            common_expirations = {
-                "onion": {"shelf": "2-3 months", "fridge": "1-2 months", "freezer": "8-12 months"},
-                "rice": {"shelf": "1-2 years (white), 3-6 months (brown)", "fridge": "Not recommended", "freezer": "Up to 6 months cooked"},
-                "chicken": {"shelf": "Not recommended raw", "fridge": "1-2 days raw, 3-4 days cooked", "freezer": "9-12 months raw, 2-6 months cooked"},
-                "paneer": {"shelf": "Not recommended", "fridge": "1-2 weeks unopened, 3-5 days opened", "freezer": "3-4 months"},
-                "green chilli": {"shelf": "1-2 weeks", "fridge": "2-3 weeks", "freezer": "4-6 months"},
-                "eggs": {"shelf": "Not recommended", "fridge": "3-5 weeks", "freezer": "Not recommended raw"},
-                "milk": {"shelf": "Not recommended fresh", "fridge": "5-7 days opened", "freezer": "3 months"},
-                "tomato": {"shelf": "4-7 days ripe", "fridge": "1-2 weeks", "freezer": "2-3 months"},
-                "potato": {"shelf": "2-3 months cool, dark place", "fridge": "3-4 weeks", "freezer": "10-12 months cooked"},
-                "bread": {"shelf": "5-7 days", "fridge": "1-2 weeks", "freezer": "2-3 months"},
-                "cheese": {"shelf": "Not recommended soft cheese", "fridge": "1-4 weeks (hard), 1-2 weeks (soft)", "freezer": "6-8 months"},
-                "leafy greens": {"shelf": "Not recommended", "fridge": "3-5 days", "freezer": "8-12 months blanched"},
-                "fruits": {"shelf": "2-7 days ripe", "fridge": "1-2 weeks", "freezer": "8-12 months"},
-                "meat": {"shelf": "Not recommended raw", "fridge": "1-2 days raw, 3-4 days cooked", "freezer": "4-12 months depending on type"},
-                "vegetables": {"shelf": "Varies by type", "fridge": "1-2 weeks most varieties", "freezer": "8-12 months"},
-                "beans": {"shelf": "1-2 years dry", "fridge": "3-5 days cooked", "freezer": "1-2 months cooked"},
-                "tofu": {"shelf": "Not recommended", "fridge": "3-5 days opened", "freezer": "4-6 months"},
-                "oil": {"shelf": "3-5 months opened", "fridge": "Up to 1 year", "freezer": "Not recommended"},
-                "garlic": {"shelf": "3-6 months whole head", "fridge": "1-2 weeks peeled", "freezer": "6-8 months"},
-                "herbs": {"shelf": "Not recommended fresh", "fridge": "1-2 weeks fresh", "freezer": "6-12 months"},
-                "spices": {"shelf": "1-2 years ground, 2-3 years whole", "fridge": "Not necessary", "freezer": "Not necessary"}
-            }
-            
+            # Only a count and a 3-item preview are shown here, so stream
+            # the tracker items instead of materializing full sorted lists
+            total_expired = sum(1 for _ in tracker.iter_expired())
+
+            preview_heap = []
+            total_expiring = 0
+            for item in tracker.iter_expiring_soon(days=3):
+                total_expiring += 1
+                entry = (-item['days_left'], -total_expiring, item)
+                if len(preview_heap) < 3:
+                    heapq.heappush(preview_heap, entry)
+                else:
+                    heapq.heappushpop(preview_heap, entry)
+            # Negated keys: reverse-sorting the kept entries yields the 3
+            # soonest items in ascending days_left order
+            expiring_preview = [entry[2] for entry in sorted(preview_heap, reverse=True)]
+
             # Show tracked items that are expiring or expired
-            if expired_items:
-                st.error(f"{len(expired_items)} items have expired! [Check Now](/?page=expiration)")
+            if total_expired:
+                st.error(f"{total_expired} items have expired! [Check Now](/?page=expiration)")
             
-            if expiring_items:
-                st.warning(f"{len(expiring_items)} tracked items expiring within 3 days!")
+            if total_expiring:
+                st.warning(f"{total_expiring} tracked items expiring within 3 days!")
                 
-                # Show the first 3 expiring items
-                for item in expiring_items[:3]:
+                # Show the first 3 expiring items in one markdown call
+                parts = []
+                for item in expiring_preview:
                     days_text = "Today!" if item.get('days_left', 0) == 0 else f"in {item.get('days_left', '?')} days"
-                    st.markdown(
-                        f"""
-                        <div style="background-color: #fff3e0; padding: 8px; border-radius: 5px; 
-                                    margin-bottom: 8px; border-left: 3px solid #ff9800;">
-                            <span style="font-weight: bold;">{item['name']}</span> ({item.get('quantity', '')})
-                            <br><span style="font-size: 12px;">Expires {days_text}</span>
-                        </div>
-                        """,
-                        unsafe_allow_html=True
-                    )
+                    parts.append(_EXPIRING_ITEM_TMPL.format(
+                        name=item['name'],
+                        quantity=item.get('quantity', ''),
+                        days_text=days_text
+                    ))
+                st.markdown("".join(parts), unsafe_allow_html=True)
                 
-                if len(expiring_items) > 3:
-                    st.write(f"[View all {len(expiring_items)} expiring items](/?page=expiration)")
+                if total_expiring > 3:
+                    st.write(f"[View all {total_expiring} expiring items](/?page=expiration)")
             
             # Get ingredients from the input
-            if ingredients:
-                input_ingredients = [i.strip().lower() for i in ingredients.split('\n') if i.strip()]
+            if ingredients_list:
+                input_ingredients = ingredients_list
                 
                 # Show expiration guidance for input ingredients
                 st.markdown("""
@@ -424,63 +655,10 @@ def display_home_page(recipe_gen, user_prefs):
                 </div>
                 """, unsafe_allow_html=True)
                 
-                for ing in input_ingredients:
-                    # Find the closest match in our common expirations dictionary
-                    match_found = False
-                    
-                    for common_ing in common_expirations:
-                        if common_ing in ing or ing in common_ing:
-                            exp_data = common_expirations[common_ing]
-                            
-                            st.markdown(
-                                f"""
-                                <div style="background-color: #fff3e0; border-radius: 8px; padding: 12px; 
-                                           margin-bottom: 12px; border-left: 3px solid #FF9800; box-shadow: 0 1px 2px rgba(0,0,0,0.05);">
-                                    <div style="font-weight: 600; color: #E65100; margin-bottom: 8px; font-size: 15px;">
-                                        {ing.capitalize()}
-                                    </div>
-                                    <div style="display: flex; gap: 10px; flex-wrap: wrap;">
-                                        <div style="flex: 1; min-width: 110px;">
-                                            <div style="font-size: 12px; color: #888; margin-bottom: 2px;">SHELF</div>
-                                            <div style="font-size: 14px;">{exp_data["shelf"]}</div>
-                                        </div>
-                                        <div style="flex: 1; min-width: 110px;">
-                                            <div style="font-size: 12px; color: #888; margin-bottom: 2px;">REFRIGERATOR</div>
-                                            <div style="font-size: 14px;">{exp_data["fridge"]}</div>
-                                        </div>
-                                        <div style="flex: 1; min-width: 110px;">
-                                            <div style="font-size: 12px; color: #888; margin-bottom: 2px;">FREEZER</div>
-                                            <div style="font-size: 14px;">{exp_data["freezer"]}</div>
-                                        </div>
-                                    </div>
-                                </div>
-                                """,
-                                unsafe_allow_html=True
-                            )
-                            
-                            match_found = True
-                            break
-                    
-                    # If no match found, show generic advice
-                    if not match_found:
-                        st.markdown(
-                            f"""
-                            <div style="background-color: #e8f5e9; border-radius: 8px; padding: 12px; 
-                                      margin-bottom: 12px; border-left: 3px solid #4CAF50; box-shadow: 0 1px 2px rgba(0,0,0,0.05);">
-                                <div style="font-weight: 600; color: #2E7D32; margin-bottom: 8px; font-size: 15px;">
-                                    {ing.capitalize()}
-                                </div>
-                                <div style="font-size: 14px; display: flex; align-items: center;">
-                                    <span style="margin-right: 10px;">🔍</span>
-                                    <span>Track this ingredient's expiration date for personalized reminders.</span>
-                                    <a href="/?page=expiration" style="margin-left: 8px; color: #1976D2; text-decoration: none; font-weight: 500;">
-                                        Add to tracker
-                                    </a>
-                                </div>
-                            </div>
-                            """,
-                            unsafe_allow_html=True
-                        )
+                st.markdown(
+                    _render_expiration_html(tuple(sorted(set(input_ingredients)))),
+                    unsafe_allow_html=True
+                )
             else:
                 # If no ingredients entered, show general expiration advice
                 st.markdown(
@@ -537,18 +715,13 @@ def display_history_page(user_prefs):
         else:
             st.write(f"You have liked {len(liked_recipes)} recipes:")
             
-            for recipe in liked_recipes:
-                with st.container():
-                    st.markdown(
-                        f"""
-                        <div style="background-color: #f0f8ff; padding: 15px; border-radius: 5px; 
-                                   margin-bottom: 15px; border-left: 4px solid #2196F3;">
-                            <span style="font-size: 18px; font-weight: bold;">{recipe['title']}</span>
-                            <p style="margin-top: 8px;">Key ingredients: {', '.join(recipe['ingredients'][:5])}</p>
-                        </div>
-                        """,
-                        unsafe_allow_html=True
-                    )
+            # One Arrow-serialized dataframe instead of an HTML card per
+            # recipe; this list is unbounded, so per-row markdown adds up
+            df = pd.DataFrame([
+                {"Title": r['title'], "Key ingredients": ", ".join(r['ingredients'][:5])}
+                for r in liked_recipes
+            ])
+            st.dataframe(df, hide_index=True, use_container_width=True)
     
     with tab2:
         st.subheader("Your Meal History")
@@ -560,45 +733,32 @@ def display_history_page(user_prefs):
         else:
             st.write(f"Your last {len(meal_history)} meals:")
             
-            # Group by date
-            from collections import defaultdict
-            from datetime import datetime
-            
-            meals_by_date = defaultdict(list)
-            
-            for meal in meal_history:
-                try:
-                    date = datetime.fromisoformat(meal["date"]).strftime("%Y-%m-%d")
-                    meals_by_date[date].append(meal)
-                except:
-                    # If date parsing fails, use "Unknown Date"
-                    meals_by_date["Unknown Date"].append(meal)
-            
-            # Display meals by date
-            for date, meals in sorted(meals_by_date.items(), reverse=True):
-                try:
-                    # Format date nicely if it's a valid date
-                    if date != "Unknown Date":
-                        formatted_date = datetime.strptime(date, "%Y-%m-%d").strftime("%A, %B %d, %Y")
-                    else:
-                        formatted_date = date
-                except:
-                    formatted_date = date
+            # Group by date with one vectorized parse instead of a
+            # datetime.fromisoformat call per meal; cache=True deduplicates
+            # repeated date strings
+            df = pd.DataFrame(meal_history)
+            df['dt'] = pd.to_datetime(df['date'], errors='coerce', cache=True)
+            df['day'] = df['dt'].dt.strftime('%Y-%m-%d').fillna('Unknown Date')
+
+            # Display meals by date, newest first
+            df = df.sort_values('dt', ascending=False, na_position='last')
+            for day, group in df.groupby('day', sort=False):
+                first_dt = group['dt'].iloc[0]
+                # Format date nicely if it's a valid date
+                if pd.notna(first_dt):
+                    formatted_date = first_dt.strftime("%A, %B %d, %Y")
+                else:
+                    formatted_date = day
                 
                 st.write(f"**{formatted_date}**")
                 
-                for meal in meals:
-                    meal_type = meal.get('meal_type', 'Meal')
-                    recipe_name = meal.get('recipe', 'Unknown recipe')
-                    
-                    st.markdown(
-                        f"""
-                        <div style="background-color: #f5f5f5; padding: 10px; border-radius: 5px; margin-bottom: 8px;">
-                            <span style="font-weight: bold;">{meal_type}:</span> {recipe_name}
-                        </div>
-                        """,
-                        unsafe_allow_html=True
-                    )
+                meals = group.reindex(columns=['meal_type', 'recipe'])
+                meals.columns = ['Meal', 'Recipe']
+                st.dataframe(
+                    meals.fillna('Unknown'),
+                    hide_index=True,
+                    use_container_width=True
+                )
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,59 +1,204 @@
-import os
-from openai import OpenAI
-import json
-
-class RecipeGenerator:
-    def __init__(self):
-        # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
-        # do not change this unless explicitly requested by the user
-        self.model = "gpt-4o"
-        self.client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-
-    def generate_recipe(self, ingredients, dietary_prefs):
-        prompt = f"""Generate a recipe using these ingredients: {', '.join(ingredients)}
-        Dietary preferences: {', '.join(dietary_prefs) if dietary_prefs else 'None'}
-        
-        Respond with a JSON object containing:
-        - title: recipe name
-        - prep_time: in minutes
-        - servings: number of servings
-        - ingredients: list of ingredients with measurements
-        - instructions: list of step-by-step instructions
-        - tips: cooking and storage tips
-        """
-
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"}
-        )
-        
-        return json.loads(response.choices[0].message.content)
-
-    def get_waste_reduction_tips(self, ingredients):
-        prompt = f"""Generate specific food waste reduction tips for these ingredients: 
-        {', '.join(ingredients)}
-        
-        Respond with a JSON array of tips."""
-
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"}
-        )
-        
-        return json.loads(response.choices[0].message.content)["tips"]
-
-    def get_substitutions(self, ingredients):
-        prompt = f"""Suggest common substitutions for these ingredients: 
-        {', '.join(ingredients)}
-        
-        Respond with a JSON object where keys are original ingredients and values are arrays of possible substitutions."""
-
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"}
-        )
-        
-        return json.loads(response.choices[0].message.content)
+import os
+import streamlit as st
+import httpx
+from openai import OpenAI, AsyncOpenAI
+from pydantic import BaseModel
+import json
+
+# orjson parses the recipe payloads ~2-3x faster than stdlib json and
+# returns the same dicts; fall back to json when it isn't installed
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# HTTP/2 lets concurrent requests share one connection, but httpx needs the
+# optional h2 package for it
+try:
+    import h2  # noqa: F401
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+_POOL_LIMITS = httpx.Limits(max_keepalive_connections=4, max_connections=8)
+
+@st.cache_resource(show_spinner=False)
+def _openai_client():
+    """One OpenAI client (and TLS connection pool) per worker.
+
+    Streamlit reruns construct a fresh RecipeGenerator each time; sharing
+    the client keeps the pooled connection alive instead of paying a new
+    TCP+TLS handshake per session interaction.
+    """
+    return OpenAI(
+        api_key=os.environ.get("OPENAI_API_KEY"),
+        http_client=httpx.Client(http2=_HTTP2, timeout=60.0, limits=_POOL_LIMITS)
+    )
+
+@st.cache_resource(show_spinner=False)
+def _openai_async_client():
+    """Async counterpart of _openai_client, sharing one pool per worker"""
+    return AsyncOpenAI(
+        api_key=os.environ.get("OPENAI_API_KEY"),
+        http_client=httpx.AsyncClient(http2=_HTTP2, timeout=60.0, limits=_POOL_LIMITS)
+    )
+
+def _normalize_ingredients(ingredients):
+    """Normalize ingredients into a sorted tuple usable as a cache key"""
+    return tuple(sorted(i.strip().lower() for i in ingredients if i.strip()))
+
+# Models for the combined response so one request returns the recipe, the
+# waste reduction tips and the substitutions together. The parse API
+# enforces the schema server-side and hands back parsed objects directly.
+class Recipe(BaseModel):
+    title: str
+    prep_time: int
+    servings: int
+    ingredients: list[str]
+    instructions: list[str]
+    tips: str
+
+class Substitution(BaseModel):
+    ingredient: str
+    substitutes: list[str]
+
+class RecipePlan(BaseModel):
+    recipe: Recipe
+    waste_tips: list[str]
+    substitutions: list[Substitution]
+
+# Plain json_schema equivalent for the streaming path, which goes through
+# the raw completions endpoint
+_COMBINED_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "recipe_plan", "schema": RecipePlan.model_json_schema()}
+}
+
+class RecipeGenerator:
+    def __init__(self):
+        # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
+        # do not change this unless explicitly requested by the user
+        self.model = "gpt-4o"
+        self.client = _openai_client()
+        self.aclient = _openai_async_client()
+
+    def generate_all(self, ingredients, dietary_prefs=None, personalization=None):
+        """Generate the recipe, waste tips and substitutions in one request.
+
+        One round trip instead of three, and the ingredient list is only
+        sent (and processed by the model) once.
+        """
+        return self._generate_all_cached(
+            _normalize_ingredients(ingredients),
+            tuple(sorted(dietary_prefs or ())),
+            personalization
+        )
+
+    async def agenerate_all(self, ingredients, dietary_prefs=None, personalization=None):
+        """Async variant of generate_all"""
+        prompt = self._combined_prompt(
+            _normalize_ingredients(ingredients),
+            tuple(sorted(dietary_prefs or ())),
+            personalization
+        )
+        response = await self.aclient.beta.chat.completions.parse(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            response_format=RecipePlan
+        )
+        return self._unpack_plan(response.choices[0].message.parsed)
+
+    def _combined_prompt(self, ingredients, dietary_prefs, personalization):
+        prompt = f"""You are helping a home cook use these ingredients: {', '.join(ingredients)}
+        Dietary preferences: {', '.join(dietary_prefs) if dietary_prefs else 'None'}
+
+        Respond with a JSON object containing:
+        - recipe: an object with title, prep_time (minutes), servings,
+          ingredients (with measurements), instructions (step by step) and
+          tips (cooking and storage tips)
+        - waste_tips: an array of specific food waste reduction tips for
+          these ingredients
+        - substitutions: an array of objects with "ingredient" and
+          "substitutes" (common replacements for that ingredient)
+        """
+
+        if personalization:
+            prompt += f"""
+        Personalize the recipe using this profile: {json.dumps(personalization)}
+        """
+
+        return prompt
+
+    def _unpack_plan(self, plan):
+        data = plan.model_dump()
+        # Keep the dict shape the UI already expects for substitutions
+        data["substitutions"] = {s.ingredient: s.substitutes for s in plan.substitutions}
+        return data
+
+    def parse_combined(self, text):
+        """Parse a combined-response payload into the dict generate_all returns"""
+        data = _loads(text)
+        # Keep the dict shape the UI already expects for substitutions
+        data["substitutions"] = {
+            entry["ingredient"]: entry["substitutes"]
+            for entry in data.get("substitutions", [])
+        }
+        return data
+
+    def stream_generate_all(self, ingredients, dietary_prefs=None, personalization=None):
+        """Stream the combined request, yielding content chunks as they arrive.
+
+        Lets the UI react at time-to-first-token instead of waiting for the
+        whole response; join the chunks and pass them to parse_combined to
+        get the same payload generate_all returns. Streaming bypasses the
+        response cache, so it is meant for the interactive generate path.
+        """
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": self._combined_prompt(
+                _normalize_ingredients(ingredients),
+                tuple(sorted(dietary_prefs or ())),
+                personalization
+            )}],
+            response_format=_COMBINED_RESPONSE_FORMAT,
+            stream=True
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    @st.cache_data(ttl=3600, show_spinner=False)
+    def _generate_all_cached(_self, ingredients, dietary_prefs, personalization):
+        prompt = _self._combined_prompt(ingredients, dietary_prefs, personalization)
+
+        response = _self.client.beta.chat.completions.parse(
+            model=_self.model,
+            messages=[{"role": "user", "content": prompt}],
+            response_format=RecipePlan
+        )
+
+        return _self._unpack_plan(response.choices[0].message.parsed)
+
+    # The original one-shot methods are kept as thin wrappers over the
+    # combined (cached) request
+    def generate_recipe(self, ingredients, dietary_prefs, personalization=None):
+        return self.generate_all(ingredients, dietary_prefs, personalization)["recipe"]
+
+    async def agenerate_recipe(self, ingredients, dietary_prefs, personalization=None):
+        result = await self.agenerate_all(ingredients, dietary_prefs, personalization)
+        return result["recipe"]
+
+    def get_waste_reduction_tips(self, ingredients):
+        return self.generate_all(ingredients)["waste_tips"]
+
+    async def aget_waste_reduction_tips(self, ingredients):
+        result = await self.agenerate_all(ingredients)
+        return result["waste_tips"]
+
+    def get_substitutions(self, ingredients):
+        return self.generate_all(ingredients)["substitutions"]
+
+    async def aget_substitutions(self, ingredients):
+        result = await self.agenerate_all(ingredients)
+        return result["substitutions"]
@@ -1,8 +1,41 @@
 import streamlit as st
 import json
+import mmap
 import os
 from datetime import datetime
 
+# Optional: msgpack deserializes several times faster than json for these
+# payloads; without it the JSON files keep working
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Parsed-file cache keyed by path. Entries invalidate when the file's mtime
+# changes, so Streamlit reruns reuse the parsed data instead of re-reading
+# and re-parsing the file on every page render.
+_DATA_CACHE = {}
+
+def _read_user_data(path):
+    """Read and parse a preferences file, reusing the parse if unchanged"""
+    mtime = os.path.getmtime(path)
+    cached = _DATA_CACHE.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    if msgpack is not None and path.endswith(".msgpack"):
+        # Memory-map the file so msgpack decodes straight from the page
+        # cache without an intermediate read() copy
+        with open(path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                data = msgpack.unpackb(buf, raw=False)
+    else:
+        with open(path, "r") as f:
+            data = json.load(f)
+
+    _DATA_CACHE[path] = (mtime, data)
+    return data
+
 class UserPreferences:
     def __init__(self, storage_file="user_data/user_preferences.json"):
         """Initialize the user preferences system"""
@@ -16,12 +49,24 @@ class UserPreferences:
         # Load existing data or create new
         self._load_data()
     
+    def _data_path(self):
+        """Path actually used for storage: the msgpack sibling of the
+        configured file when msgpack is available, else the file itself"""
+        if msgpack is None:
+            return self.storage_file
+        base, _ = os.path.splitext(self.storage_file)
+        return base + ".msgpack"
+
     def _load_data(self):
         """Load user preference data from file"""
         try:
-            if os.path.exists(self.storage_file):
-                with open(self.storage_file, 'r') as f:
-                    self.user_data = json.load(f)
+            path = self._data_path()
+            if os.path.exists(path):
+                self.user_data = _read_user_data(path)
+            elif path != self.storage_file and os.path.exists(self.storage_file):
+                # Migrate an existing JSON file to the msgpack format
+                self.user_data = _read_user_data(self.storage_file)
+                self._save_data()
             else:
                 self.user_data = {
                     "dietary_preferences": [],
@@ -53,8 +98,12 @@ class UserPreferences:
     def _save_data(self):
         """Save user preference data to file"""
         try:
-            with open(self.storage_file, 'w') as f:
-                json.dump(self.user_data, f, indent=2)
+            if msgpack is not None:
+                with open(self._data_path(), "wb") as f:
+                    f.write(msgpack.packb(self.user_data, use_bin_type=True))
+            else:
+                with open(self.storage_file, 'w') as f:
+                    json.dump(self.user_data, f, indent=2)
         except Exception as e:
             print(f"Error saving user data: {e}")
     